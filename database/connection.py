@@ -1,176 +1,389 @@
-import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
-from dotenv import load_dotenv
-
-# Load .env file for local development
-load_dotenv()
-
-# Prefer DATABASE_URL (Render), fallback to manual config for local
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-if DATABASE_URL:
-    DB_CONN_STRING = DATABASE_URL
-else:
-    DB_CONN_STRING = (
-        f"postgresql://{os.getenv('DB_USER', 'postgres')}:"
-        f"{os.getenv('DB_PASSWORD', 'postgres')}@"
-        f"{os.getenv('DB_HOST', 'localhost')}:"
-        f"{os.getenv('DB_PORT', '5432')}/"
-        f"{os.getenv('DB_NAME', 'menuzy')}"
-    )
+import orjson
+import psycopg
+from psycopg import sql
+from psycopg.rows import dict_row
+from psycopg.types.json import JsonbDumper, set_json_loads
+from psycopg.types.numeric import FloatLoader, NumericBinaryLoader
+from psycopg_pool import AsyncConnectionPool
+from contextlib import asynccontextmanager, AsyncExitStack
+from utils.settings import (
+    DB_CONN_STRING, USE_PGBOUNCER, DB_PREPARE_THRESHOLD, TEMPLATE_DB_NAME, TEST_DB_NAME,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_CHECK, DB_POOL_TIMEOUT, DB_STREAM_TIMEOUT_MS
+)
+
+# Autocommit: single statements commit on their own and reads skip BEGIN/COMMIT
+# round-trips; multi-statement writes use `async with conn.transaction()`.
+# Direct connections prepare hot statements early; server-side prepared
+# statements don't survive PgBouncer transaction pooling, so disable them there.
+# The hottest fixed-text reads pass prepare=True to skip the warm-up executions;
+# psycopg ignores that flag when prepare_threshold is None.
+CONNECTION_KWARGS = {
+    "autocommit": True,
+    "row_factory": dict_row,
+    "prepare_threshold": None if USE_PGBOUNCER else DB_PREPARE_THRESHOLD,
+}
+
+class _OrjsonJsonbDumper(JsonbDumper):
+    """JSONB parameters encoded with orjson"""
+    _dumps = orjson.dumps
+
+class _NumericFloatBinaryLoader(NumericBinaryLoader):
+    """Binary NUMERIC loaded as float instead of Decimal"""
+    def load(self, data):
+        return float(super().load(data))
+
+async def _configure_connection(conn):
+    """Per-connection adapter setup, run once when the pool opens a connection"""
+    # Pass dicts straight through as JSONB parameters (price, opening_hours),
+    # encoding and decoding JSONB with orjson instead of the stdlib json module
+    conn.adapters.register_dumper(dict, _OrjsonJsonbDumper)
+    set_json_loads(orjson.loads, conn)
+    # NUMERIC (restaurant rating) is exposed as float by every response model;
+    # loading it as float lets orjson write it natively instead of via a Decimal fallback
+    conn.adapters.register_loader("numeric", FloatLoader)
+    conn.adapters.register_loader("numeric", _NumericFloatBinaryLoader)
 
-@contextmanager
-def get_db_connection():
-    conn = None
-    try:
-        conn = psycopg2.connect(DB_CONN_STRING, cursor_factory=RealDictCursor)
+# Shared pool of warm connections; opened and closed by the app lifespan
+pool = AsyncConnectionPool(
+    DB_CONN_STRING,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    kwargs=CONNECTION_KWARGS,
+    configure=_configure_connection,
+    check=AsyncConnectionPool.check_connection if DB_POOL_CHECK else None,
+    open=False,
+)
+
+@asynccontextmanager
+async def get_db_connection():
+    """Borrow a connection from the pool (rolled back on error, returned on exit)"""
+    async with pool.connection() as conn:
         yield conn
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        raise e
-    finally:
-        if conn:
-            conn.close()
+
+async def stream_rows(query, params=None, itersize=200):
+    """Run a query through a server-side cursor on its own pooled connection, returning a row iterator"""
+    # Checkout, execution and the first fetch happen here, before any response has
+    # started, so pool timeouts and query errors still surface as real status codes
+    async with AsyncExitStack() as stack:
+        conn = await stack.enter_async_context(get_db_connection())
+        await stack.enter_async_context(conn.transaction())
+        # Bound how long a slow reader can keep this transaction (and connection) open:
+        # Postgres ends the session once it sits idle between fetches for too long
+        await conn.execute(
+            "SELECT set_config('statement_timeout', %s, true),"
+            " set_config('idle_in_transaction_session_timeout', %s, true)",
+            (str(DB_STREAM_TIMEOUT_MS), str(DB_STREAM_TIMEOUT_MS))
+        )
+        cursor = await stack.enter_async_context(conn.cursor(name="menuzy_stream"))
+        await cursor.execute(query, params)
+        rows = await cursor.fetchmany(itersize)
+        # Success: hand the open connection/transaction over to the iterator
+        stack = stack.pop_all()
+    return _iter_rows(stack, cursor, rows, itersize)
+
+async def _iter_rows(stack, cursor, rows, itersize):
+    """Yield the primed batch and the rest of the cursor, releasing the connection at the end"""
+    # The connection is held until the caller stops iterating (e.g. the response is sent)
+    async with stack:
+        while rows:
+            for row in rows:
+                yield row
+            rows = await cursor.fetchmany(itersize)
+
+async def copy_rows(conn, table, columns, rows):
+    """Bulk-load rows into table(columns) with COPY FROM STDIN (for imports)"""
+    query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns)
+    )
+    async with conn.cursor().copy(query) as copy:
+        for row in rows:
+            await copy.write_row(row)
+
+# Full schema bootstrap, sent to the server as one multi-statement round-trip
+SCHEMA_SQL = """
+    -- Extensions (great-circle distance search for /restaurants/nearby)
+    CREATE EXTENSION IF NOT EXISTS cube;
+    CREATE EXTENSION IF NOT EXISTS earthdistance;
+    -- Trigram matching for substring search on /restaurants/search
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+    -- Users table
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash VARCHAR(255),
+        full_name VARCHAR(255) NOT NULL,
+        phone VARCHAR(20),
+        role VARCHAR(20) DEFAULT 'customer' CHECK (role IN ('customer', 'restaurant_admin', 'super_admin')),
+        google_id VARCHAR(255),
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Categories table
+    CREATE TABLE IF NOT EXISTS categories (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        description TEXT,
+        icon VARCHAR(255),
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Restaurants table
+    CREATE TABLE IF NOT EXISTS restaurants (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        description TEXT,
+        address TEXT NOT NULL,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        phone VARCHAR(20),
+        email VARCHAR(255),
+        category_id INTEGER REFERENCES categories(id),
+        owner_id INTEGER REFERENCES users(id),
+        image_url VARCHAR(500),
+        opening_hours JSONB,
+        is_active BOOLEAN DEFAULT TRUE,
+        rating DECIMAL(3, 2) DEFAULT 0.0,
+        total_reviews INTEGER DEFAULT 0,
+        rating_sum INTEGER DEFAULT 0,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Coordinates used to be DECIMAL; convert older databases in place
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'restaurants' AND column_name = 'latitude') = 'numeric' THEN
+            ALTER TABLE restaurants
+                ALTER latitude TYPE DOUBLE PRECISION,
+                ALTER longitude TYPE DOUBLE PRECISION;
+        END IF;
+    END $$;
+
+    -- Running sum of review ratings keeps rating updates O(1); backfill older databases
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'restaurants' AND column_name = 'rating_sum') THEN
+            ALTER TABLE restaurants ADD COLUMN rating_sum INTEGER DEFAULT 0;
+            IF to_regclass('reviews') IS NOT NULL THEN
+                UPDATE restaurants r SET
+                    rating_sum = s.rating_sum,
+                    total_reviews = s.review_count
+                FROM (
+                    SELECT restaurant_id, SUM(rating) AS rating_sum, COUNT(*) AS review_count
+                    FROM reviews GROUP BY restaurant_id
+                ) s
+                WHERE r.id = s.restaurant_id;
+            END IF;
+        END IF;
+    END $$;
+
+    -- created_at is the keyset pagination key of the superadmin lists; older
+    -- databases allowed NULLs, so backfill them and add the constraint once
+    DO $$
+    BEGIN
+        IF (SELECT is_nullable FROM information_schema.columns
+            WHERE table_name = 'users' AND column_name = 'created_at') = 'YES' THEN
+            UPDATE users SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP)
+                WHERE created_at IS NULL;
+            ALTER TABLE users ALTER created_at SET NOT NULL;
+        END IF;
+        IF (SELECT is_nullable FROM information_schema.columns
+            WHERE table_name = 'restaurants' AND column_name = 'created_at') = 'YES' THEN
+            UPDATE restaurants SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP)
+                WHERE created_at IS NULL;
+            ALTER TABLE restaurants ALTER created_at SET NOT NULL;
+        END IF;
+    END $$;
+
+    -- Menu categories
+    CREATE TABLE IF NOT EXISTS menu_categories (
+        id SERIAL PRIMARY KEY,
+        restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+        name VARCHAR(100) NOT NULL,
+        description TEXT,
+        display_order INTEGER DEFAULT 0,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Menu items
+    CREATE TABLE IF NOT EXISTS menu_items (
+        id SERIAL PRIMARY KEY,
+        restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+        menu_category_id INTEGER REFERENCES menu_categories(id) ON DELETE CASCADE,
+        name VARCHAR(255) NOT NULL,
+        description TEXT,
+        price JSONB NOT NULL,
+        image_url VARCHAR(500),
+        is_vegetarian BOOLEAN DEFAULT FALSE,
+        is_vegan BOOLEAN DEFAULT FALSE,
+        is_gluten_free BOOLEAN DEFAULT FALSE,
+        ingredients TEXT[],
+        allergens TEXT[],
+        is_available BOOLEAN DEFAULT TRUE,
+        display_order INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Reviews
+    CREATE TABLE IF NOT EXISTS reviews (
+        id SERIAL PRIMARY KEY,
+        restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        rating INTEGER CHECK (rating >= 1 AND rating <= 5),
+        comment TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(restaurant_id, user_id)
+    );
+
+    -- add_review only ever increments the restaurant aggregate; deleted reviews
+    -- (including ON DELETE CASCADE from users) are subtracted here, once per statement
+    CREATE OR REPLACE FUNCTION reviews_after_delete() RETURNS trigger AS $$
+    BEGIN
+        UPDATE restaurants r SET
+            rating_sum = GREATEST(COALESCE(r.rating_sum, 0) - d.rating_sum, 0),
+            total_reviews = GREATEST(COALESCE(r.total_reviews, 0) - d.review_count, 0),
+            rating = CASE
+                WHEN COALESCE(r.total_reviews, 0) - d.review_count > 0 THEN
+                    ((COALESCE(r.rating_sum, 0) - d.rating_sum)::DECIMAL
+                     / (COALESCE(r.total_reviews, 0) - d.review_count))::DECIMAL(3,2)
+                ELSE 0.0
+            END
+        FROM (
+            SELECT restaurant_id, COALESCE(SUM(rating), 0) AS rating_sum, COUNT(*) AS review_count
+            FROM old_reviews GROUP BY restaurant_id
+        ) d
+        WHERE r.id = d.restaurant_id;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql;
+
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'reviews_after_delete') THEN
+            CREATE TRIGGER reviews_after_delete
+                AFTER DELETE ON reviews
+                REFERENCING OLD TABLE AS old_reviews
+                FOR EACH STATEMENT EXECUTE FUNCTION reviews_after_delete();
+        END IF;
+    END $$;
+
+    -- Favorites
+    CREATE TABLE IF NOT EXISTS favorites (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_id, restaurant_id)
+    );
+
+    -- Default categories
+    INSERT INTO categories (name, description, icon) VALUES
+    ('Fast Food', 'Quick service restaurants', '🍔'),
+    ('Fine Dining', 'Upscale dining experience', '🍽️'),
+    ('Cafe', 'Coffee shops and light meals', '☕'),
+    ('Pizza', 'Pizza restaurants', '🍕'),
+    ('Asian', 'Asian cuisine', '🥢'),
+    ('Italian', 'Italian cuisine', '🍝'),
+    ('Mexican', 'Mexican cuisine', '🌮'),
+    ('Indian', 'Indian cuisine', '🍛'),
+    ('Desserts', 'Dessert and sweet shops', '🍰'),
+    ('Healthy', 'Health-focused restaurants', '🥗')
+    ON CONFLICT (name) DO NOTHING;
+
+    -- Indexes (built after the seed rows are in)
+    DROP INDEX IF EXISTS idx_restaurants_location;
+    CREATE INDEX IF NOT EXISTS idx_restaurants_geo ON restaurants USING gist (ll_to_earth(latitude, longitude));
+    CREATE INDEX IF NOT EXISTS idx_restaurants_category ON restaurants(category_id);
+    CREATE INDEX IF NOT EXISTS idx_menu_items_restaurant ON menu_items(restaurant_id);
+    -- Review listings filter on restaurant and sort newest first
+    DROP INDEX IF EXISTS idx_reviews_restaurant;
+    CREATE INDEX IF NOT EXISTS idx_reviews_restaurant_created ON reviews(restaurant_id, created_at DESC);
+    -- Rating-ordered walk for /search terms too short for the trigram index (< 3 chars)
+    CREATE INDEX IF NOT EXISTS idx_restaurants_active_rating
+        ON restaurants(rating DESC, name) WHERE is_active;
+    -- Keyset pagination of the superadmin restaurant and user lists
+    CREATE INDEX IF NOT EXISTS idx_restaurants_created ON restaurants(created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at DESC, id DESC);
+    -- Active-user count on the dashboard (active restaurants use idx_restaurants_active_rating)
+    CREATE INDEX IF NOT EXISTS idx_users_active ON users(id) WHERE is_active;
+    -- Not unique: create-restaurant may assign an existing user as owner again
+    CREATE INDEX IF NOT EXISTS idx_restaurants_owner ON restaurants(owner_id);
+    CREATE INDEX IF NOT EXISTS idx_menu_categories_restaurant_order
+        ON menu_categories(restaurant_id, display_order, name) WHERE is_active;
+    -- Replaces idx_menu_items_rest_cat_order, whose INCLUDE copied free-form price JSONB
+    DROP INDEX IF EXISTS idx_menu_items_rest_cat_order;
+    CREATE INDEX IF NOT EXISTS idx_menu_items_available
+        ON menu_items(restaurant_id, menu_category_id, display_order) WHERE is_available;
+    CREATE INDEX IF NOT EXISTS idx_menu_items_ingredients ON menu_items USING gin (ingredients);
+    CREATE INDEX IF NOT EXISTS idx_menu_items_allergens ON menu_items USING gin (allergens);
+    DROP INDEX IF EXISTS idx_favorites_user;
+    CREATE INDEX IF NOT EXISTS idx_favorites_user_created
+        ON favorites(user_id, created_at DESC) INCLUDE (restaurant_id);
+    -- Expression must stay identical to RESTAURANT_SEARCH_TEXT in database/queries.py
+    DROP INDEX IF EXISTS idx_restaurants_search_trgm;
+    CREATE INDEX IF NOT EXISTS idx_restaurants_search ON restaurants USING gin (
+        (name || chr(1) || coalesce(description, '') || chr(1) || coalesce(address, '')) gin_trgm_ops
+    );
+"""
+
+# Advisory lock key serializing schema bootstrap across worker processes
+_SCHEMA_LOCK_ID = 0x6D656E75  # "menu"
+
+def _apply_schema(conn):
+    """Run SCHEMA_SQL on an open connection and commit"""
+    cursor = conn.cursor()
+    
+    # Whole schema in one round-trip and a single (async) commit flush. Every worker
+    # runs this at startup; concurrent CREATE ... IF NOT EXISTS transactions collide
+    # on the catalogs, so each waits for the transaction-scoped lock in turn
+    cursor.execute(
+        f"SELECT pg_advisory_xact_lock({_SCHEMA_LOCK_ID});\n"
+        "SET LOCAL synchronous_commit = off;\n" + SCHEMA_SQL
+    )
+    
+    conn.commit()
 
 def init_db():
     """Initialize database with required tables"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password_hash VARCHAR(255),
-                full_name VARCHAR(255) NOT NULL,
-                phone VARCHAR(20),
-                role VARCHAR(20) DEFAULT 'customer' CHECK (role IN ('customer', 'restaurant_admin', 'super_admin')),
-                google_id VARCHAR(255),
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Categories table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS categories (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL UNIQUE,
-                description TEXT,
-                icon VARCHAR(255),
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Restaurants table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS restaurants (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                description TEXT,
-                address TEXT NOT NULL,
-                latitude DECIMAL(10, 8),
-                longitude DECIMAL(11, 8),
-                phone VARCHAR(20),
-                email VARCHAR(255),
-                category_id INTEGER REFERENCES categories(id),
-                owner_id INTEGER REFERENCES users(id),
-                image_url VARCHAR(500),
-                opening_hours JSONB,
-                is_active BOOLEAN DEFAULT TRUE,
-                rating DECIMAL(3, 2) DEFAULT 0.0,
-                total_reviews INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Menu categories
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS menu_categories (
-                id SERIAL PRIMARY KEY,
-                restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
-                name VARCHAR(100) NOT NULL,
-                description TEXT,
-                display_order INTEGER DEFAULT 0,
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Menu items
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS menu_items (
-                id SERIAL PRIMARY KEY,
-                restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
-                menu_category_id INTEGER REFERENCES menu_categories(id) ON DELETE CASCADE,
-                name VARCHAR(255) NOT NULL,
-                description TEXT,
-                price JSONB NOT NULL,
-                image_url VARCHAR(500),
-                is_vegetarian BOOLEAN DEFAULT FALSE,
-                is_vegan BOOLEAN DEFAULT FALSE,
-                is_gluten_free BOOLEAN DEFAULT FALSE,
-                ingredients TEXT[],
-                allergens TEXT[],
-                is_available BOOLEAN DEFAULT TRUE,
-                display_order INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Reviews
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS reviews (
-                id SERIAL PRIMARY KEY,
-                restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                rating INTEGER CHECK (rating >= 1 AND rating <= 5),
-                comment TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(restaurant_id, user_id)
-            );
-        """)
-        
-        # Favorites
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS favorites (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                restaurant_id INTEGER REFERENCES restaurants(id) ON DELETE CASCADE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, restaurant_id)
-            );
-        """)
-        
-        # Indexes
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_restaurants_location ON restaurants(latitude, longitude);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_restaurants_category ON restaurants(category_id);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_menu_items_restaurant ON menu_items(restaurant_id);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_restaurant ON reviews(restaurant_id);")
-        
-        # Default categories
-        cursor.execute("""
-            INSERT INTO categories (name, description, icon) VALUES
-            ('Fast Food', 'Quick service restaurants', '🍔'),
-            ('Fine Dining', 'Upscale dining experience', '🍽️'),
-            ('Cafe', 'Coffee shops and light meals', '☕'),
-            ('Pizza', 'Pizza restaurants', '🍕'),
-            ('Asian', 'Asian cuisine', '🥢'),
-            ('Italian', 'Italian cuisine', '🍝'),
-            ('Mexican', 'Mexican cuisine', '🌮'),
-            ('Indian', 'Indian cuisine', '🍛'),
-            ('Desserts', 'Dessert and sweet shops', '🍰'),
-            ('Healthy', 'Health-focused restaurants', '🥗')
-            ON CONFLICT (name) DO NOTHING;
-        """)
-        
-        conn.commit()
+    with psycopg.connect(DB_CONN_STRING, row_factory=dict_row) as conn:
+        _apply_schema(conn)
         print("✅ Database initialized successfully!")
+
+def _maintenance_connection():
+    """Autocommit connection to the 'postgres' database for CREATE/DROP DATABASE"""
+    return psycopg.connect(DB_CONN_STRING, dbname="postgres", autocommit=True)
+
+def bootstrap_template():
+    """Create the template database with the full schema (run once per server)"""
+    with _maintenance_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (TEMPLATE_DB_NAME,))
+        if not cursor.fetchone():
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(TEMPLATE_DB_NAME)))
+    
+    with psycopg.connect(DB_CONN_STRING, dbname=TEMPLATE_DB_NAME) as conn:
+        _apply_schema(conn)
+    
+    with _maintenance_connection() as conn:
+        conn.execute(
+            sql.SQL("ALTER DATABASE {} WITH is_template TRUE").format(sql.Identifier(TEMPLATE_DB_NAME))
+        )
+
+def reset_test_db():
+    """Recreate the test database as a fresh clone of the template"""
+    with _maintenance_connection() as conn:
+        conn.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(TEST_DB_NAME)))
+        conn.execute(
+            sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+                sql.Identifier(TEST_DB_NAME), sql.Identifier(TEMPLATE_DB_NAME)
+            )
+        )
@@ -0,0 +1,22 @@
+from cachetools import TTLCache
+from database.queries import OWNER_RESTAURANT
+
+# owner user id -> restaurant id; ownership is set once at restaurant creation
+_owner_restaurants = TTLCache(maxsize=10_000, ttl=300)
+
+async def get_owner_restaurant_id(conn, user_id: int):
+    """Restaurant id managed by a restaurant admin, or None; cached per process"""
+    restaurant_id = _owner_restaurants.get(user_id)
+    if restaurant_id is None:
+        cursor = conn.cursor()
+        await cursor.execute(OWNER_RESTAURANT, (user_id,), prepare=True)
+        restaurant = await cursor.fetchone()
+        if not restaurant:
+            # Misses are not cached so a newly assigned owner is seen immediately
+            return None
+        restaurant_id = _owner_restaurants[user_id] = restaurant["id"]
+    return restaurant_id
+
+def forget_owner_restaurant(user_id: int):
+    """Drop a cached mapping after ownership changes"""
+    _owner_restaurants.pop(user_id, None)
@@ -0,0 +1,81 @@
+# Shared SQL reused across routers. Keeping the text identical everywhere also
+# lets Postgres/psycopg reuse the same prepared plan.
+
+# Restaurant columns exposed by RestaurantResponse (internal ones like rating_sum stay out)
+RESTAURANT_COLUMNS = (
+    "r.id, r.name, r.description, r.address, r.latitude, r.longitude, r.phone, r.email, "
+    "r.category_id, r.owner_id, r.image_url, r.opening_hours, r.is_active, r.rating, "
+    "r.total_reviews, r.created_at"
+)
+
+# Menu item columns exposed by MenuItemResponse (for paths that skip model validation)
+MENU_ITEM_COLUMNS = (
+    "mi.id, mi.restaurant_id, mi.menu_category_id, mi.name, mi.description, mi.price, "
+    "mi.image_url, mi.is_vegetarian, mi.is_vegan, mi.is_gluten_free, mi.ingredients, "
+    "mi.allergens, mi.is_available, mi.display_order, mi.created_at"
+)
+
+# Restaurant rows with their category name resolved in the same query
+RESTAURANT_SELECT = """
+    SELECT """ + RESTAURANT_COLUMNS + """, c.name AS category_name
+    FROM restaurants r
+    LEFT JOIN categories c ON c.id = r.category_id
+"""
+
+# Narrow restaurant rows for list views (RestaurantSummary)
+RESTAURANT_SUMMARY_SELECT = """
+    SELECT r.id, r.name, r.address, r.latitude, r.longitude, r.phone, r.email,
+           r.category_id, r.owner_id, r.image_url, r.is_active, r.created_at,
+           c.name AS category_name
+    FROM restaurants r
+    LEFT JOIN categories c ON c.id = r.category_id
+"""
+
+# Hot read paths. psycopg prepares a statement server-side once its text has
+# been executed DB_PREPARE_THRESHOLD times on a connection, so these stay fixed.
+RESTAURANT_BY_ID = RESTAURANT_SELECT + "WHERE r.id = %s AND r.is_active = TRUE"
+
+ACTIVE_RESTAURANT_EXISTS = "SELECT id FROM restaurants WHERE id = %s AND is_active = TRUE"
+
+RESTAURANT_MENU = """
+    SELECT mi.*, mc.name AS category_name
+    FROM menu_items mi
+    LEFT JOIN menu_categories mc ON mi.menu_category_id = mc.id
+    WHERE mi.restaurant_id = %s AND mi.is_available = TRUE
+    ORDER BY mc.display_order, mi.display_order, mi.name
+"""
+
+RESTAURANT_REVIEWS = """
+    SELECT r.*, u.full_name AS user_name
+    FROM reviews r
+    JOIN users u ON r.user_id = u.id
+    WHERE r.restaurant_id = %s
+    ORDER BY r.created_at DESC
+    LIMIT %s
+"""
+
+CATEGORIES_ALL = "SELECT * FROM categories ORDER BY name"
+
+# Super admin reads
+DASHBOARD_STATS = """
+    SELECT
+        (SELECT COUNT(*) FROM restaurants WHERE is_active = TRUE) AS total_restaurants,
+        (SELECT COUNT(*) FROM users WHERE is_active = TRUE) AS total_users,
+        (SELECT COUNT(*) FROM reviews) AS total_reviews,
+        (SELECT COUNT(*) FROM categories WHERE is_active = TRUE) AS total_categories
+"""
+
+# User columns exposed by UserResponse (never the password hash)
+USER_SELECT = "SELECT id, email, full_name, phone, role, is_active, created_at FROM users "
+
+USER_BY_ID = USER_SELECT + "WHERE id = %s"
+
+# The restaurant managed by a restaurant admin (owner_id = %s)
+OWNER_RESTAURANT = "SELECT id FROM restaurants WHERE owner_id = %s ORDER BY id LIMIT 1"
+
+# Text searched by /restaurants/search; matches the idx_restaurants_search expression.
+# Fields are joined with chr(1), which search terms never contain, so a match
+# cannot span the end of one column and the start of the next
+RESTAURANT_SEARCH_TEXT = (
+    "(r.name || chr(1) || coalesce(r.description, '') || chr(1) || coalesce(r.address, ''))"
+)
@@ -1,49 +1,84 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from psycopg_pool import PoolTimeout
 import uvicorn
-from database.connection import get_db_connection, init_db
+from database.connection import pool, init_db
 from routers import auth, restaurants, admin, superadmin
 from utils.auth import verify_token
+from utils.settings import ENV, CORS_ORIGINS, WEB_CONCURRENCY
 
 security = HTTPBearer()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database on startup
-    init_db()
+    # Initialize database on startup (test runs start from a template clone instead)
+    if ENV != "test":
+        init_db()
+    # Pydantic v2 compiles schemas and the routers' TypeAdapters at import;
+    # the remaining first-request cost is connecting, so fill the pool now
+    await pool.open(wait=True)
     yield
+    await pool.close()
 
 app = FastAPI(
     title="Menuzy API",
     description="Restaurant Management System API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "PUT", "DELETE", "PATCH"),
+    allow_headers=("Authorization", "Content-Type"),
+    max_age=86400,
 )
 
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    # Every pooled connection stayed busy for DB_POOL_TIMEOUT: shed load instead of a 500
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily overloaded, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(restaurants.router, prefix="/restaurants", tags=["Restaurants"])
 app.include_router(admin.router, prefix="/admin", tags=["Restaurant Admin"])
 app.include_router(superadmin.router, prefix="/superadmin", tags=["Super Admin"])
 
+# Static payloads are serialized once at import
+_ROOT_BODY = ORJSONResponse({"message": "Welcome to Menuzy API"}).body
+_ROOT_ETAG = '"v1"'
+_ROOT_HEADERS = {"ETag": _ROOT_ETAG, "Cache-Control": "public, max-age=3600"}
+_HEALTH_BODY = ORJSONResponse({"status": "healthy"}).body
+
 @app.get("/")
-async def root():
-    return {"message": "Welcome to Menuzy API"}
+async def root(request: Request):
+    if request.headers.get("if-none-match") == _ROOT_ETAG:
+        return Response(status_code=304, headers=_ROOT_HEADERS)
+    return Response(content=_ROOT_BODY, media_type="application/json", headers=_ROOT_HEADERS)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        http="httptools",
+        loop="uvloop",
+        workers=WEB_CONCURRENCY,
+        reload=ENV == "dev"
+    )
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, StringConstraints, field_validator
+from typing import Optional, List, Dict, Any, Annotated
 from datetime import datetime
 from enum import Enum
+import re
+
+# Cheap shape check for the login path; signup keeps full EmailStr validation
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 class UserRole(str, Enum):
     CUSTOMER = "customer"
@@ -16,13 +20,22 @@ class UserCreate(BaseModel):
     phone: Optional[str] = None
 
 class UserLogin(BaseModel):
-    email: EmailStr
+    email: Annotated[str, StringConstraints(pattern=EMAIL_RE.pattern, max_length=254)]
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def normalize_domain(cls, email: str) -> str:
+        """Lowercase the domain, as EmailStr does for the stored signup address"""
+        local, domain = email.rsplit("@", 1)
+        return f"{local}@{domain.lower()}"
+
 class GoogleLogin(BaseModel):
     google_token: str
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     email: str
     full_name: str
@@ -31,6 +44,10 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
 # Restaurant schemas
 class RestaurantCreate(BaseModel):
     name: str
@@ -57,6 +74,8 @@ class RestaurantUpdate(BaseModel):
     opening_hours: Optional[Dict[str, Any]] = None
 
 class RestaurantResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     description: Optional[str]
@@ -75,6 +94,29 @@ class RestaurantResponse(BaseModel):
     total_reviews: int
     created_at: datetime
 
+# List view: the wide description/opening_hours columns are only on the detail responses
+class RestaurantSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    address: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    phone: Optional[str]
+    email: Optional[str]
+    category_id: int
+    category_name: Optional[str]
+    owner_id: int
+    image_url: Optional[str]
+    is_active: bool
+    created_at: datetime
+
+# Keyset-paginated lists; pass next_cursor back as ?cursor= for the following page
+class RestaurantPage(BaseModel):
+    items: List[RestaurantSummary]
+    next_cursor: Optional[str] = None
+
 # Menu Category schemas
 class MenuCategoryCreate(BaseModel):
     name: str
@@ -82,6 +124,8 @@ class MenuCategoryCreate(BaseModel):
     display_order: Optional[int] = 0
 
 class MenuCategoryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     restaurant_id: int
     name: str
@@ -119,6 +163,8 @@ class MenuItemUpdate(BaseModel):
     display_order: Optional[int] = None
 
 class MenuItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     restaurant_id: int
     menu_category_id: int
@@ -142,6 +188,8 @@ class ReviewCreate(BaseModel):
     comment: Optional[str] = None
 
 class ReviewResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     restaurant_id: int
     user_id: int
@@ -157,6 +205,8 @@ class CategoryCreate(BaseModel):
     icon: Optional[str] = None
 
 class CategoryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     description: Optional[str]
@@ -5,308 +5,229 @@ from models.schemas import (
     MenuCategoryCreate, MenuCategoryResponse,
     LocationUpdate, ReviewResponse
 )
-from database.connection import get_db_connection
-from utils.auth import get_current_user_id, get_current_user_role
-from psycopg2.extras import RealDictCursor
+from database.connection import get_db_connection, stream_rows
+from database.queries import RESTAURANT_SELECT, MENU_ITEM_COLUMNS
+from database.ownership import get_owner_restaurant_id
+from utils.auth import verify_token
+from utils.responses import list_response, raw_list_response, stream_list_response
+from pydantic import TypeAdapter
 from typing import List
-import json
 
 router = APIRouter()
 security = HTTPBearer()
 
-def verify_restaurant_admin(credentials: HTTPAuthorizationCredentials, restaurant_id: int = None):
-    """Verify user is restaurant admin and optionally owns the restaurant"""
-    user_id = get_current_user_id(credentials.credentials)
-    user_role = get_current_user_role(credentials.credentials)
+_MenuCategoryListAdapter = TypeAdapter(List[MenuCategoryResponse])
+
+async def verify_restaurant_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
+    """Dependency: verify user is a restaurant admin and return their user id"""
+    # One (memoized) token decode serves both the role check and the user id
+    payload = verify_token(credentials.credentials)
     
-    if user_role not in ["restaurant_admin", "super_admin"]:
+    if payload.get("role") not in ("restaurant_admin", "super_admin"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access restaurant admin features"
         )
     
-    if restaurant_id and user_role == "restaurant_admin":
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT owner_id FROM restaurants WHERE id = %s", (restaurant_id,))
-            restaurant = cursor.fetchone()
-            
-            if not restaurant or restaurant[0] != user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not authorized to manage this restaurant"
-                )
-    
-    return user_id
+    return int(payload["sub"])
+
+async def require_owner_restaurant_id(conn, user_id: int) -> int:
+    """Restaurant id of the admin's restaurant, 404 if they have none"""
+    restaurant_id = await get_owner_restaurant_id(conn, user_id)
+    if restaurant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No restaurant found"
+        )
+    return restaurant_id
 
 @router.get("/restaurant")
-async def get_my_restaurant(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_my_restaurant(user_id: int = Depends(verify_restaurant_admin)):
     """Get restaurant owned by current admin"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT r.*, c.name as category_name
-            FROM restaurants r
-            LEFT JOIN categories c ON r.category_id = c.id
-            WHERE r.owner_id = %s
-        """, (user_id,))
+        await cursor.execute(RESTAURANT_SELECT + "WHERE r.owner_id = %s", (user_id,))
         
-        restaurant = cursor.fetchone()
+        restaurant = await cursor.fetchone()
         if not restaurant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No restaurant found for this admin"
             )
         
-        return dict(restaurant)
+        return restaurant
 
 @router.get("/menu-categories", response_model=List[MenuCategoryResponse])
-async def get_menu_categories(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_menu_categories(user_id: int = Depends(verify_restaurant_admin)):
     """Get menu categories for admin's restaurant"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
-            )
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             SELECT * FROM menu_categories 
             WHERE restaurant_id = %s AND is_active = TRUE
             ORDER BY display_order, name
-        """, (restaurant["id"],))
+        """, (restaurant_id,))
         
-        categories = cursor.fetchall()
-        return [dict(category) for category in categories]
+        categories = await cursor.fetchall()
+        return list_response(_MenuCategoryListAdapter, categories)
 
 @router.post("/menu-categories", response_model=MenuCategoryResponse)
 async def create_menu_category(
     category: MenuCategoryCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: int = Depends(verify_restaurant_admin)
 ):
     """Create a new menu category"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
-            )
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             INSERT INTO menu_categories (restaurant_id, name, description, display_order)
             VALUES (%s, %s, %s, %s)
             RETURNING *
-        """, (restaurant["id"], category.name, category.description, category.display_order))
-        
-        new_category = cursor.fetchone()
-        conn.commit()
+        """, (restaurant_id, category.name, category.description, category.display_order))
         
-        return dict(new_category)
+        new_category = await cursor.fetchone()
+        return new_category
 
-@router.get("/menu", response_model=List[MenuItemResponse])
-async def get_menu_items(credentials: HTTPAuthorizationCredentials = Depends(security)):
+@router.get("/menu", responses={200: {"model": List[MenuItemResponse]}})
+async def get_menu_items(user_id: int = Depends(verify_restaurant_admin)):
     """Get all menu items for admin's restaurant"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
-            )
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
+        cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT mi.*, mc.name as category_name
+        # Raw (unvalidated) response: select exactly the MenuItemResponse columns
+        await cursor.execute("""
+            SELECT """ + MENU_ITEM_COLUMNS + """, mc.name as category_name
             FROM menu_items mi
             LEFT JOIN menu_categories mc ON mi.menu_category_id = mc.id
             WHERE mi.restaurant_id = %s
             ORDER BY mc.display_order, mi.display_order, mi.name
-        """, (restaurant["id"],))
+        """, (restaurant_id,))
         
-        menu_items = cursor.fetchall()
-        return [dict(item) for item in menu_items]
+        menu_items = await cursor.fetchall()
+        return raw_list_response(menu_items)
 
 @router.post("/menu", response_model=MenuItemResponse)
 async def create_menu_item(
     menu_item: MenuItemCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: int = Depends(verify_restaurant_admin)
 ):
     """Create a new menu item"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
+        cursor = conn.cursor()
         
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
+        # Insert only if the menu category belongs to the admin's restaurant,
+        # returning the new row with its category name in the same round-trip
+        await cursor.execute("""
+            WITH ins AS (
+                INSERT INTO menu_items (
+                    restaurant_id, menu_category_id, name, description, price,
+                    image_url, is_vegetarian, is_vegan, is_gluten_free,
+                    ingredients, allergens, display_order
+                )
+                SELECT mc.restaurant_id, mc.id, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                FROM menu_categories mc
+                WHERE mc.id = %s AND mc.restaurant_id = %s
+                RETURNING *
             )
+            SELECT ins.*, mc.name AS category_name
+            FROM ins
+            LEFT JOIN menu_categories mc ON mc.id = ins.menu_category_id
+        """, (
+            menu_item.name, menu_item.description, menu_item.price,
+            menu_item.image_url, menu_item.is_vegetarian, menu_item.is_vegan,
+            menu_item.is_gluten_free, menu_item.ingredients, menu_item.allergens,
+            menu_item.display_order, menu_item.menu_category_id, restaurant_id
+        ))
         
-        restaurant_id = restaurant["id"]
-        
-        # Verify menu category belongs to this restaurant
-        cursor.execute("""
-            SELECT id FROM menu_categories 
-            WHERE id = %s AND restaurant_id = %s
-        """, (menu_item.menu_category_id, restaurant_id))
-        
-        if not cursor.fetchone():
+        new_item = await cursor.fetchone()
+        if not new_item:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid menu category"
             )
         
-        cursor.execute("""
-            INSERT INTO menu_items (
-                restaurant_id, menu_category_id, name, description, price,
-                image_url, is_vegetarian, is_vegan, is_gluten_free,
-                ingredients, allergens, display_order
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING *
-        """, (
-            restaurant_id, menu_item.menu_category_id, menu_item.name,
-            menu_item.description, json.dumps(menu_item.price), menu_item.image_url,
-            menu_item.is_vegetarian, menu_item.is_vegan, menu_item.is_gluten_free,
-            menu_item.ingredients, menu_item.allergens, menu_item.display_order
-        ))
-        
-        new_item = cursor.fetchone()
-        
-        # Get category name
-        cursor.execute("SELECT name FROM menu_categories WHERE id = %s", (menu_item.menu_category_id,))
-        category = cursor.fetchone()
-        
-        conn.commit()
-        
-        item_data = dict(new_item)
-        item_data["category_name"] = category["name"] if category else None
-        
-        return item_data
+        return new_item
 
 @router.put("/menu/{item_id}", response_model=MenuItemResponse)
 async def update_menu_item(
     item_id: int,
     menu_item: MenuItemUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: int = Depends(verify_restaurant_admin)
 ):
     """Update a menu item"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
+        cursor = conn.cursor()
         
-        # Get restaurant ID and verify ownership
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
+        if not menu_item.model_dump(exclude_none=True):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No fields to update"
             )
         
-        restaurant_id = restaurant["id"]
-        
-        # Verify menu item belongs to this restaurant
-        cursor.execute("""
-            SELECT * FROM menu_items WHERE id = %s AND restaurant_id = %s
-        """, (item_id, restaurant_id))
+        # One constant statement for every partial update (stable text, one cached plan):
+        # fields left out or sent as null keep their current value.
+        # Ownership is checked in the same statement as the update.
+        await cursor.execute("""
+            WITH upd AS (
+                UPDATE menu_items SET
+                    menu_category_id = COALESCE(%s, menu_category_id),
+                    name = COALESCE(%s, name),
+                    description = COALESCE(%s, description),
+                    price = COALESCE(%s, price),
+                    image_url = COALESCE(%s, image_url),
+                    is_vegetarian = COALESCE(%s, is_vegetarian),
+                    is_vegan = COALESCE(%s, is_vegan),
+                    is_gluten_free = COALESCE(%s, is_gluten_free),
+                    ingredients = COALESCE(%s, ingredients),
+                    allergens = COALESCE(%s, allergens),
+                    is_available = COALESCE(%s, is_available),
+                    display_order = COALESCE(%s, display_order),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND restaurant_id = %s
+                RETURNING *
+            )
+            SELECT upd.*, mc.name AS category_name
+            FROM upd
+            LEFT JOIN menu_categories mc ON mc.id = upd.menu_category_id
+        """, (
+            menu_item.menu_category_id, menu_item.name, menu_item.description,
+            menu_item.price, menu_item.image_url, menu_item.is_vegetarian, menu_item.is_vegan,
+            menu_item.is_gluten_free, menu_item.ingredients, menu_item.allergens,
+            menu_item.is_available, menu_item.display_order,
+            item_id, restaurant_id
+        ))
         
-        existing_item = cursor.fetchone()
-        if not existing_item:
+        updated_item = await cursor.fetchone()
+        if not updated_item:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Menu item not found"
             )
         
-        # Build update query dynamically
-        update_fields = []
-        params = []
-        
-        for field, value in menu_item.dict(exclude_unset=True).items():
-            if field == "price" and value is not None:
-                update_fields.append(f"{field} = %s")
-                params.append(json.dumps(value))
-            elif value is not None:
-                update_fields.append(f"{field} = %s")
-                params.append(value)
-        
-        if not update_fields:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No fields to update"
-            )
-        
-        params.append(item_id)
-        
-        cursor.execute(f"""
-            UPDATE menu_items SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-            RETURNING *
-        """, params)
-        
-        updated_item = cursor.fetchone()
-        
-        # Get category name
-        cursor.execute("SELECT name FROM menu_categories WHERE id = %s", (updated_item["menu_category_id"],))
-        category = cursor.fetchone()
-        
-        conn.commit()
-        
-        item_data = dict(updated_item)
-        item_data["category_name"] = category["name"] if category else None
-        
-        return item_data
+        return updated_item
 
 @router.delete("/menu/{item_id}")
 async def delete_menu_item(
     item_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: int = Depends(verify_restaurant_admin)
 ):
     """Delete a menu item"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
         cursor = conn.cursor()
         
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
-            )
-        
         # Delete menu item
-        cursor.execute("""
+        await cursor.execute("""
             DELETE FROM menu_items WHERE id = %s AND restaurant_id = %s
-        """, (item_id, restaurant[0]))
+        """, (item_id, restaurant_id))
         
         if cursor.rowcount == 0:
             raise HTTPException(
@@ -314,22 +235,18 @@ async def delete_menu_item(
                 detail="Menu item not found"
             )
         
-        conn.commit()
-        
         return {"message": "Menu item deleted successfully"}
 
 @router.put("/location")
 async def update_location(
     location: LocationUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    user_id: int = Depends(verify_restaurant_admin)
 ):
     """Update restaurant location"""
-    user_id = verify_restaurant_admin(credentials)
-    
-    with get_db_connection() as conn:
+    async with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             UPDATE restaurants SET 
                 latitude = %s, longitude = %s, address = %s, updated_at = CURRENT_TIMESTAMP
             WHERE owner_id = %s
@@ -341,34 +258,19 @@ async def update_location(
                 detail="Restaurant not found"
             )
         
-        conn.commit()
-        
         return {"message": "Location updated successfully"}
 
-@router.get("/reviews", response_model=List[ReviewResponse])
-async def get_restaurant_reviews(credentials: HTTPAuthorizationCredentials = Depends(security)):
+@router.get("/reviews", responses={200: {"model": List[ReviewResponse]}})
+async def get_restaurant_reviews(user_id: int = Depends(verify_restaurant_admin)):
     """Get all reviews for admin's restaurant"""
-    user_id = verify_restaurant_admin(credentials)
+    async with get_db_connection() as conn:
+        restaurant_id = await require_owner_restaurant_id(conn, user_id)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get restaurant ID
-        cursor.execute("SELECT id FROM restaurants WHERE owner_id = %s", (user_id,))
-        restaurant = cursor.fetchone()
-        if not restaurant:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No restaurant found"
-            )
-        
-        cursor.execute("""
-            SELECT r.*, u.full_name as user_name
-            FROM reviews r
-            JOIN users u ON r.user_id = u.id
-            WHERE r.restaurant_id = %s
-            ORDER BY r.created_at DESC
-        """, (restaurant["id"],))
-        
-        reviews = cursor.fetchall()
-        return [dict(review) for review in reviews]
+    # Unbounded list: stream it from a server-side cursor instead of materializing it
+    return stream_list_response(await stream_rows("""
+        SELECT r.*, u.full_name as user_name
+        FROM reviews r
+        JOIN users u ON r.user_id = u.id
+        WHERE r.restaurant_id = %s
+        ORDER BY r.created_at DESC
+    """, (restaurant_id,)))
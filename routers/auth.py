@@ -2,8 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from models.schemas import UserCreate, UserLogin, GoogleLogin, Token, UserResponse
 from database.connection import get_db_connection
-from utils.auth import hash_password, verify_password, create_access_token
-from psycopg2.extras import RealDictCursor
+from utils.auth import hash_password_async, verify_password_async, create_access_token
 import json
 
 router = APIRouter()
@@ -12,27 +11,26 @@ security = HTTPBearer()
 @router.post("/register", response_model=Token)
 async def register(user: UserCreate):
     """Register a new user"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if user already exists
-        cursor.execute("SELECT id FROM users WHERE email = %s", (user.email,))
-        if cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    # Hash before borrowing a pooled connection so it isn't held during bcrypt
+    hashed_password = await hash_password_async(user.password)
+    
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        # Hash password and create user
-        hashed_password = hash_password(user.password)
-        cursor.execute("""
+        # Create user; the unique email constraint replaces a separate existence check
+        await cursor.execute("""
             INSERT INTO users (email, password_hash, full_name, phone, role)
             VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (email) DO NOTHING
             RETURNING id, email, full_name, phone, role, is_active, created_at
         """, (user.email, hashed_password, user.full_name, user.phone, "customer"))
         
-        new_user = cursor.fetchone()
-        conn.commit()
+        new_user = await cursor.fetchone()
+        if not new_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         
         # Create access token
         access_token = create_access_token(
@@ -42,40 +40,41 @@ async def register(user: UserCreate):
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "user": dict(new_user)
+            "user": new_user
         }
 
 @router.post("/login", response_model=Token)
 async def login(user: UserLogin):
     """Login user with email and password"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             SELECT id, email, password_hash, full_name, phone, role, is_active, created_at
             FROM users WHERE email = %s AND is_active = TRUE
         """, (user.email,))
         
-        db_user = cursor.fetchone()
-        if not db_user or not verify_password(user.password, db_user["password_hash"]):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-        
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": str(db_user["id"]), "role": db_user["role"]}
+        db_user = await cursor.fetchone()
+    
+    # Password check runs after the pooled connection is returned
+    if not db_user or not await verify_password_async(user.password, db_user["password_hash"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
         )
-        
-        user_data = dict(db_user)
-        del user_data["password_hash"]  # Remove password hash from response
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": user_data
-        }
+    
+    # Create access token
+    access_token = create_access_token(
+        data={"sub": str(db_user["id"]), "role": db_user["role"]}
+    )
+    
+    del db_user["password_hash"]  # Remove password hash from response
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": db_user
+    }
 
 @router.post("/google", response_model=Token)
 async def google_login(google_data: GoogleLogin):
@@ -98,19 +97,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     user_id = get_current_user_id(credentials.credentials)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             SELECT id, email, full_name, phone, role, is_active, created_at
             FROM users WHERE id = %s AND is_active = TRUE
         """, (user_id,))
         
-        user = cursor.fetchone()
+        user = await cursor.fetchone()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        return dict(user)
+        return user
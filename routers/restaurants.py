@@ -1,17 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from models.schemas import RestaurantResponse, ReviewCreate, ReviewResponse, MenuItemResponse
 from database.connection import get_db_connection
+from database.queries import (
+    RESTAURANT_COLUMNS, RESTAURANT_SELECT, RESTAURANT_BY_ID, ACTIVE_RESTAURANT_EXISTS,
+    RESTAURANT_MENU, RESTAURANT_REVIEWS, RESTAURANT_SEARCH_TEXT
+)
 from utils.auth import get_current_user_id
-from psycopg2.extras import RealDictCursor
+from utils.responses import list_response, cached_json_response
+from pydantic import TypeAdapter
 from typing import List, Optional
 import json
 
 router = APIRouter()
 security = HTTPBearer()
 
+_RestaurantAdapter = TypeAdapter(RestaurantResponse)
+_RestaurantListAdapter = TypeAdapter(List[RestaurantResponse])
+_MenuItemListAdapter = TypeAdapter(List[MenuItemResponse])
+_ReviewListAdapter = TypeAdapter(List[ReviewResponse])
+
 @router.get("/nearby", response_model=List[RestaurantResponse])
 async def get_nearby_restaurants(
+    request: Request,
     latitude: float = Query(..., description="User's latitude"),
     longitude: float = Query(..., description="User's longitude"),
     radius: float = Query(10.0, description="Search radius in kilometers"),
@@ -19,60 +30,60 @@ async def get_nearby_restaurants(
     limit: int = Query(20, description="Number of results to return")
 ):
     """Get nearby restaurants based on GPS coordinates"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
         
+        # earth_box is answered by the ll_to_earth GiST index; earth_distance trims the box corners.
+        # Ordering by cube <-> (chord length, monotonic in great-circle distance) lets the same
+        # index return rows nearest-first so LIMIT stops early instead of sorting every match.
         base_query = """
-            SELECT r.*, c.name as category_name,
-                   (6371 * acos(cos(radians(%s)) * cos(radians(r.latitude)) * 
-                   cos(radians(r.longitude) - radians(%s)) + 
-                   sin(radians(%s)) * sin(radians(r.latitude)))) AS distance
+            SELECT """ + RESTAURANT_COLUMNS + """, c.name as category_name,
+                   earth_distance(o.origin, ll_to_earth(r.latitude, r.longitude)) / 1000.0 AS distance
             FROM restaurants r
+            CROSS JOIN (SELECT ll_to_earth(%s, %s) AS origin) o
             LEFT JOIN categories c ON r.category_id = c.id
             WHERE r.is_active = TRUE AND r.latitude IS NOT NULL AND r.longitude IS NOT NULL
+              AND earth_box(o.origin, %s) @> ll_to_earth(r.latitude, r.longitude)
+              AND earth_distance(o.origin, ll_to_earth(r.latitude, r.longitude)) <= %s
         """
         
-        params = [latitude, longitude, latitude]
+        radius_m = radius * 1000
+        params = [latitude, longitude, radius_m, radius_m]
         
         if category_id:
             base_query += " AND r.category_id = %s"
             params.append(category_id)
         
         base_query += """
-            HAVING distance <= %s
-            ORDER BY distance
+            ORDER BY ll_to_earth(r.latitude, r.longitude) <-> o.origin
             LIMIT %s
         """
-        params.extend([radius, limit])
+        params.append(limit)
         
-        cursor.execute(base_query, params)
-        restaurants = cursor.fetchall()
+        await cursor.execute(base_query, params, prepare=True)
+        restaurants = await cursor.fetchall()
         
-        return [dict(restaurant) for restaurant in restaurants]
+        return list_response(_RestaurantListAdapter, restaurants, request)
 
 @router.get("/search", response_model=List[RestaurantResponse])
 async def search_restaurants(
+    request: Request,
     q: str = Query(..., description="Search query"),
     category_id: Optional[int] = Query(None, description="Filter by category"),
     limit: int = Query(20, description="Number of results to return")
 ):
     """Search restaurants by name or location"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
         
-        base_query = """
-            SELECT r.*, c.name as category_name
-            FROM restaurants r
-            LEFT JOIN categories c ON r.category_id = c.id
-            WHERE r.is_active = TRUE AND (
-                r.name ILIKE %s OR 
-                r.description ILIKE %s OR 
-                r.address ILIKE %s
-            )
+        # One ILIKE over the concatenated columns so the trigram GIN index can serve it
+        base_query = RESTAURANT_SELECT + """
+            WHERE r.is_active = TRUE AND """ + RESTAURANT_SEARCH_TEXT + """ ILIKE %s
         """
         
-        search_term = f"%{q}%"
-        params = [search_term, search_term, search_term]
+        # The column separator is never part of a term
+        search_term = f"%{q.replace(chr(1), '')}%"
+        params = [search_term]
         
         if category_id:
             base_query += " AND r.category_id = %s"
@@ -81,57 +92,50 @@ async def search_restaurants(
         base_query += " ORDER BY r.rating DESC, r.name LIMIT %s"
         params.append(limit)
         
-        cursor.execute(base_query, params)
-        restaurants = cursor.fetchall()
+        await cursor.execute(base_query, params)
+        restaurants = await cursor.fetchall()
         
-        return [dict(restaurant) for restaurant in restaurants]
+        return list_response(_RestaurantListAdapter, restaurants, request)
 
 @router.get("/{restaurant_id}", response_model=RestaurantResponse)
-async def get_restaurant_detail(restaurant_id: int):
+async def get_restaurant_detail(restaurant_id: int, request: Request):
     """Get detailed information about a specific restaurant"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
         
-        cursor.execute("""
-            SELECT r.*, c.name as category_name
-            FROM restaurants r
-            LEFT JOIN categories c ON r.category_id = c.id
-            WHERE r.id = %s AND r.is_active = TRUE
-        """, (restaurant_id,))
+        await cursor.execute(RESTAURANT_BY_ID, (restaurant_id,), prepare=True)
         
-        restaurant = cursor.fetchone()
+        restaurant = await cursor.fetchone()
         if not restaurant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Restaurant not found"
             )
         
-        return dict(restaurant)
+        return cached_json_response(
+            request, _RestaurantAdapter.dump_json(_RestaurantAdapter.validate_python(restaurant))
+        )
 
 @router.get("/{restaurant_id}/menu", response_model=List[MenuItemResponse])
-async def get_restaurant_menu(restaurant_id: int):
+async def get_restaurant_menu(restaurant_id: int, request: Request):
     """Get menu items for a specific restaurant"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
+        menu_cursor = conn.cursor(binary=True)
+        
+        # Existence check and menu fetch are sent together in one round-trip
+        async with conn.pipeline():
+            await cursor.execute(ACTIVE_RESTAURANT_EXISTS, (restaurant_id,), prepare=True)
+            await menu_cursor.execute(RESTAURANT_MENU, (restaurant_id,), prepare=True)
         
-        # First check if restaurant exists
-        cursor.execute("SELECT id FROM restaurants WHERE id = %s AND is_active = TRUE", (restaurant_id,))
-        if not cursor.fetchone():
+        if not await cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Restaurant not found"
             )
         
-        cursor.execute("""
-            SELECT mi.*, mc.name as category_name
-            FROM menu_items mi
-            LEFT JOIN menu_categories mc ON mi.menu_category_id = mc.id
-            WHERE mi.restaurant_id = %s AND mi.is_available = TRUE
-            ORDER BY mc.display_order, mi.display_order, mi.name
-        """, (restaurant_id,))
-        
-        menu_items = cursor.fetchall()
-        return [dict(item) for item in menu_items]
+        menu_items = await menu_cursor.fetchall()
+        return list_response(_MenuItemListAdapter, menu_items, request)
 
 @router.post("/{restaurant_id}/review", response_model=ReviewResponse)
 async def add_review(
@@ -142,73 +146,62 @@ async def add_review(
     """Add a review for a restaurant (requires authentication)"""
     user_id = get_current_user_id(credentials.credentials)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        # Check if restaurant exists
-        cursor.execute("SELECT id FROM restaurants WHERE id = %s AND is_active = TRUE", (restaurant_id,))
-        if not cursor.fetchone():
+        # Insert the review, bump the restaurant aggregate and fetch the author's
+        # name in one statement. The aggregate is maintained incrementally from the
+        # stored running sum, so no existing reviews are read; the row lock taken by
+        # the UPDATE serialises concurrent reviews of the same restaurant.
+        await cursor.execute("""
+            WITH new_r AS (
+                INSERT INTO reviews (restaurant_id, user_id, rating, comment)
+                SELECT %s, %s, %s, %s
+                WHERE EXISTS (SELECT 1 FROM restaurants WHERE id = %s AND is_active = TRUE)
+                ON CONFLICT (restaurant_id, user_id) DO NOTHING
+                RETURNING id, restaurant_id, user_id, rating, comment, created_at
+            ), upd AS (
+                UPDATE restaurants SET
+                    rating_sum = COALESCE(rating_sum, 0) + new_r.rating,
+                    total_reviews = COALESCE(total_reviews, 0) + 1,
+                    rating = ((COALESCE(rating_sum, 0) + new_r.rating)::DECIMAL
+                              / (COALESCE(total_reviews, 0) + 1))::DECIMAL(3,2)
+                FROM new_r
+                WHERE restaurants.id = new_r.restaurant_id
+            )
+            SELECT new_r.*, u.full_name AS user_name
+            FROM new_r
+            JOIN users u ON u.id = new_r.user_id
+        """, (restaurant_id, user_id, review.rating, review.comment, restaurant_id))
+        
+        new_review = await cursor.fetchone()
+        if new_review:
+            return new_review
+        
+        # Nothing inserted: either the restaurant is missing or this is a repeat review
+        await cursor.execute(ACTIVE_RESTAURANT_EXISTS, (restaurant_id,))
+        if not await cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Restaurant not found"
             )
         
-        # Check if user already reviewed this restaurant
-        cursor.execute("""
-            SELECT id FROM reviews WHERE restaurant_id = %s AND user_id = %s
-        """, (restaurant_id, user_id))
-        
-        if cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You have already reviewed this restaurant"
-            )
-        
-        # Add review
-        cursor.execute("""
-            INSERT INTO reviews (restaurant_id, user_id, rating, comment)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id, restaurant_id, user_id, rating, comment, created_at
-        """, (restaurant_id, user_id, review.rating, review.comment))
-        
-        new_review = cursor.fetchone()
-        
-        # Update restaurant rating
-        cursor.execute("""
-            UPDATE restaurants SET 
-                rating = (SELECT AVG(rating)::DECIMAL(3,2) FROM reviews WHERE restaurant_id = %s),
-                total_reviews = (SELECT COUNT(*) FROM reviews WHERE restaurant_id = %s)
-            WHERE id = %s
-        """, (restaurant_id, restaurant_id, restaurant_id))
-        
-        # Get user name for response
-        cursor.execute("SELECT full_name FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        
-        conn.commit()
-        
-        review_data = dict(new_review)
-        review_data["user_name"] = user["full_name"]
-        
-        return review_data
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already reviewed this restaurant"
+        )
 
 @router.get("/{restaurant_id}/reviews", response_model=List[ReviewResponse])
-async def get_restaurant_reviews(restaurant_id: int, limit: int = Query(50)):
+async def get_restaurant_reviews(restaurant_id: int, request: Request, limit: int = Query(50, ge=1, le=200)):
     """Get reviews for a specific restaurant"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    # Public endpoint: bounded pages only, so a slow reader never pins a pooled connection
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
         
-        cursor.execute("""
-            SELECT r.*, u.full_name as user_name
-            FROM reviews r
-            JOIN users u ON r.user_id = u.id
-            WHERE r.restaurant_id = %s
-            ORDER BY r.created_at DESC
-            LIMIT %s
-        """, (restaurant_id, limit))
+        await cursor.execute(RESTAURANT_REVIEWS, (restaurant_id, limit), prepare=True)
         
-        reviews = cursor.fetchall()
-        return [dict(review) for review in reviews]
+        reviews = await cursor.fetchall()
+        return list_response(_ReviewListAdapter, reviews, request)
 
 @router.post("/favorites/{restaurant_id}")
 async def add_to_favorites(
@@ -218,26 +211,28 @@ async def add_to_favorites(
     """Add restaurant to user's favorites"""
     user_id = get_current_user_id(credentials.credentials)
     
-    with get_db_connection() as conn:
+    async with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Check if restaurant exists
-        cursor.execute("SELECT id FROM restaurants WHERE id = %s AND is_active = TRUE", (restaurant_id,))
-        if not cursor.fetchone():
+        # Existence check and insert (ignored if already a favorite) in one statement;
+        # a row comes back only if the restaurant exists
+        await cursor.execute("""
+            WITH r AS (
+                SELECT id FROM restaurants WHERE id = %s AND is_active = TRUE
+            ), ins AS (
+                INSERT INTO favorites (user_id, restaurant_id)
+                SELECT %s, id FROM r
+                ON CONFLICT (user_id, restaurant_id) DO NOTHING
+            )
+            SELECT id FROM r
+        """, (restaurant_id, user_id))
+        
+        if not await cursor.fetchone():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Restaurant not found"
             )
         
-        # Add to favorites (ignore if already exists)
-        cursor.execute("""
-            INSERT INTO favorites (user_id, restaurant_id)
-            VALUES (%s, %s)
-            ON CONFLICT (user_id, restaurant_id) DO NOTHING
-        """, (user_id, restaurant_id))
-        
-        conn.commit()
-        
         return {"message": "Restaurant added to favorites"}
 
 @router.delete("/favorites/{restaurant_id}")
@@ -248,15 +243,13 @@ async def remove_from_favorites(
     """Remove restaurant from user's favorites"""
     user_id = get_current_user_id(credentials.credentials)
     
-    with get_db_connection() as conn:
+    async with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             DELETE FROM favorites WHERE user_id = %s AND restaurant_id = %s
         """, (user_id, restaurant_id))
         
-        conn.commit()
-        
         return {"message": "Restaurant removed from favorites"}
 
 @router.get("/favorites/my", response_model=List[RestaurantResponse])
@@ -264,17 +257,14 @@ async def get_my_favorites(credentials: HTTPAuthorizationCredentials = Depends(s
     """Get user's favorite restaurants"""
     user_id = get_current_user_id(credentials.credentials)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor(binary=True)
         
-        cursor.execute("""
-            SELECT r.*, c.name as category_name
-            FROM restaurants r
+        await cursor.execute(RESTAURANT_SELECT + """
             JOIN favorites f ON r.id = f.restaurant_id
-            LEFT JOIN categories c ON r.category_id = c.id
             WHERE f.user_id = %s AND r.is_active = TRUE
             ORDER BY f.created_at DESC
         """, (user_id,))
         
-        favorites = cursor.fetchall()
-        return [dict(restaurant) for restaurant in favorites]
+        favorites = await cursor.fetchall()
+        return list_response(_RestaurantListAdapter, favorites)
@@ -1,54 +1,60 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from models.schemas import (
     RestaurantCreate, RestaurantUpdate, RestaurantResponse,
-    CategoryCreate, CategoryResponse, UserResponse, UserCreate
+    CategoryCreate, CategoryResponse, UserResponse, UserCreate,
+    RestaurantPage, UserPage
 )
 from database.connection import get_db_connection
-from utils.auth import get_current_user_role, hash_password
-from psycopg2.extras import RealDictCursor
-from typing import List
+from database.queries import (
+    RESTAURANT_SUMMARY_SELECT, CATEGORIES_ALL, DASHBOARD_STATS, USER_SELECT, USER_BY_ID
+)
+from database.ownership import forget_owner_restaurant
+from utils.auth import verify_token
+from utils.pagination import decode_cursor, page
+from pydantic import TypeAdapter
+from typing import List, Optional
+from cachetools import TTLCache
 
 router = APIRouter()
 security = HTTPBearer()
 
-def verify_super_admin(credentials: HTTPAuthorizationCredentials):
-    """Verify user is super admin"""
-    user_role = get_current_user_role(credentials.credentials)
+_CategoryListAdapter = TypeAdapter(List[CategoryResponse])
+
+# Dashboard counts are polled often and may lag by a few seconds; cleared on writes
+# this process makes that change them
+_dashboard_cache = TTLCache(maxsize=1, ttl=30)
+
+# Serialized category list; near-static, cleared on category writes in this process
+_categories_cache = TTLCache(maxsize=1, ttl=60)
+
+async def require_super_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Dependency: verify user is super admin and return their token payload"""
+    payload = verify_token(credentials.credentials)
     
-    if user_role != "super_admin":
+    if payload.get("role") != "super_admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Super admin access required"
         )
+    
+    return payload
 
 @router.get("/dashboard")
-async def get_dashboard_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_dashboard_stats(payload: dict = Depends(require_super_admin)):
     """Get dashboard statistics for super admin"""
-    verify_super_admin(credentials)
+    stats = _dashboard_cache.get("stats")
+    if stats is not None:
+        return stats
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get various statistics
-        cursor.execute("SELECT COUNT(*) as total_restaurants FROM restaurants WHERE is_active = TRUE")
-        restaurants_count = cursor.fetchone()["total_restaurants"]
-        
-        cursor.execute("SELECT COUNT(*) as total_users FROM users WHERE is_active = TRUE")
-        users_count = cursor.fetchone()["total_users"]
-        
-        cursor.execute("SELECT COUNT(*) as total_reviews FROM reviews")
-        reviews_count = cursor.fetchone()["total_reviews"]
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) as total_categories FROM categories WHERE is_active = TRUE")
-        categories_count = cursor.fetchone()["total_categories"]
+        # All statistics in one round-trip
+        await cursor.execute(DASHBOARD_STATS, prepare=True)
         
-        return {
-            "total_restaurants": restaurants_count,
-            "total_users": users_count,
-            "total_reviews": reviews_count,
-            "total_categories": categories_count
-        }
+        stats = _dashboard_cache["stats"] = await cursor.fetchone()
+        return stats
 
 @router.post("/create-restaurant", response_model=RestaurantResponse)
 async def create_restaurant_with_owner(
@@ -56,114 +62,119 @@ async def create_restaurant_with_owner(
     owner_email: str,
     owner_name: str,
     owner_phone: str = None,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Create a new restaurant and assign an owner"""
-    verify_super_admin(credentials)
-    print(restaurant_data)
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if owner email already exists
-        cursor.execute("SELECT id FROM users WHERE email = %s", (owner_email,))
-        existing_user = cursor.fetchone()
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        if existing_user:
-            owner_id = existing_user["id"]
-            # Update user role to restaurant_admin
-            cursor.execute("""
-                UPDATE users SET role = 'restaurant_admin' WHERE id = %s
-            """, (owner_id,))
-        else:
-            # Create new restaurant admin user
-            cursor.execute("""
+        # Owner provisioning and restaurant insert succeed or fail together
+        async with conn.transaction():
+            # Create the owner as a restaurant admin, or promote the existing user
+            await cursor.execute("""
                 INSERT INTO users (email, full_name, phone, role)
                 VALUES (%s, %s, %s, 'restaurant_admin')
+                ON CONFLICT (email) DO UPDATE SET role = 'restaurant_admin'
                 RETURNING id
             """, (owner_email, owner_name, owner_phone))
-            owner_id = cursor.fetchone()["id"]
-        
-        # Create restaurant
-        cursor.execute("""
-            INSERT INTO restaurants (
-                name, description, address, latitude, longitude,
-                phone, email, category_id, owner_id, image_url, opening_hours
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING *
-        """, (
-            restaurant_data.name, restaurant_data.description, restaurant_data.address,
-            restaurant_data.latitude, restaurant_data.longitude, restaurant_data.phone,
-            restaurant_data.email, restaurant_data.category_id, owner_id,
-            restaurant_data.image_url, restaurant_data.opening_hours
-        ))
-        
-        new_restaurant = cursor.fetchone()
-        
-        # Get category name
-        cursor.execute("SELECT name FROM categories WHERE id = %s", (restaurant_data.category_id,))
-        category = cursor.fetchone()
-        
-        conn.commit()
-        
-        restaurant_data = dict(new_restaurant)
-        restaurant_data["category_name"] = category["name"] if category else None
-        
-        return restaurant_data
+            owner_id = (await cursor.fetchone())["id"]
+            
+            # Create restaurant, returned with its category name
+            await cursor.execute("""
+                WITH ins AS (
+                    INSERT INTO restaurants (
+                        name, description, address, latitude, longitude,
+                        phone, email, category_id, owner_id, image_url, opening_hours
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING *
+                )
+                SELECT ins.*, c.name AS category_name
+                FROM ins
+                LEFT JOIN categories c ON c.id = ins.category_id
+            """, (
+                restaurant_data.name, restaurant_data.description, restaurant_data.address,
+                restaurant_data.latitude, restaurant_data.longitude, restaurant_data.phone,
+                restaurant_data.email, restaurant_data.category_id, owner_id,
+                restaurant_data.image_url, restaurant_data.opening_hours
+            ))
+            
+            new_restaurant = await cursor.fetchone()
+        
+        forget_owner_restaurant(owner_id)
+        _dashboard_cache.clear()
+        
+        return new_restaurant
 
-@router.get("/restaurants", response_model=List[RestaurantResponse])
-async def get_all_restaurants(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get all restaurants"""
-    verify_super_admin(credentials)
+@router.get("/restaurants", response_model=RestaurantPage)
+async def get_all_restaurants(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    payload: dict = Depends(require_super_admin)
+):
+    """Get all restaurants, newest first, one keyset page at a time"""
+    query = RESTAURANT_SUMMARY_SELECT
+    params = []
+    if cursor:
+        query += "WHERE (r.created_at, r.id) < (%s, %s) "
+        params.extend(decode_cursor(cursor))
+    query += "ORDER BY r.created_at DESC, r.id DESC LIMIT %s"
+    params.append(limit + 1)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        db_cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT r.*, c.name as category_name
-            FROM restaurants r
-            LEFT JOIN categories c ON r.category_id = c.id
-            ORDER BY r.created_at DESC
-        """)
+        # Only two fixed texts per list (first page / later pages): prepare them up front
+        await db_cursor.execute(query, params, prepare=True)
         
-        restaurants = cursor.fetchall()
-        return [dict(restaurant) for restaurant in restaurants]
+        restaurants = await db_cursor.fetchall()
+        return page(restaurants, limit)
 
 @router.put("/restaurant/{restaurant_id}", response_model=RestaurantResponse)
 async def update_restaurant(
     restaurant_id: int,
     restaurant_data: RestaurantUpdate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Update restaurant information"""
-    verify_super_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Build update query dynamically
-        update_fields = []
-        params = []
-        
-        for field, value in restaurant_data.dict(exclude_unset=True).items():
-            if value is not None:
-                update_fields.append(f"{field} = %s")
-                params.append(value)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        if not update_fields:
+        if not restaurant_data.model_dump(exclude_none=True):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No fields to update"
             )
         
-        params.append(restaurant_id)
-        
-        cursor.execute(f"""
-            UPDATE restaurants SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-            RETURNING *
-        """, params)
+        # One constant statement for every partial update (stable text, one cached plan):
+        # fields left out or sent as null keep their current value
+        await cursor.execute("""
+            WITH upd AS (
+                UPDATE restaurants SET
+                    name = COALESCE(%s, name),
+                    description = COALESCE(%s, description),
+                    address = COALESCE(%s, address),
+                    latitude = COALESCE(%s, latitude),
+                    longitude = COALESCE(%s, longitude),
+                    phone = COALESCE(%s, phone),
+                    email = COALESCE(%s, email),
+                    category_id = COALESCE(%s, category_id),
+                    image_url = COALESCE(%s, image_url),
+                    opening_hours = COALESCE(%s, opening_hours),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+                RETURNING *
+            )
+            SELECT upd.*, c.name AS category_name
+            FROM upd
+            LEFT JOIN categories c ON c.id = upd.category_id
+        """, (
+            restaurant_data.name, restaurant_data.description, restaurant_data.address,
+            restaurant_data.latitude, restaurant_data.longitude, restaurant_data.phone,
+            restaurant_data.email, restaurant_data.category_id, restaurant_data.image_url,
+            restaurant_data.opening_hours, restaurant_id
+        ))
         
-        updated_restaurant = cursor.fetchone()
+        updated_restaurant = await cursor.fetchone()
         
         if not updated_restaurant:
             raise HTTPException(
@@ -171,112 +182,106 @@ async def update_restaurant(
                 detail="Restaurant not found"
             )
         
-        # Get category name
-        cursor.execute("SELECT name FROM categories WHERE id = %s", (updated_restaurant["category_id"],))
-        category = cursor.fetchone()
-        
-        conn.commit()
-        
-        restaurant_data = dict(updated_restaurant)
-        restaurant_data["category_name"] = category["name"] if category else None
-        
-        return restaurant_data
+        return updated_restaurant
 
-@router.get("/users", response_model=List[UserResponse])
-async def get_all_users(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get all users"""
-    verify_super_admin(credentials)
+@router.get("/users", response_model=UserPage)
+async def get_all_users(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    payload: dict = Depends(require_super_admin)
+):
+    """Get all users, newest first, one keyset page at a time"""
+    query = USER_SELECT
+    params = []
+    if cursor:
+        query += "WHERE (created_at, id) < (%s, %s) "
+        params.extend(decode_cursor(cursor))
+    query += "ORDER BY created_at DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        db_cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, email, full_name, phone, role, is_active, created_at
-            FROM users
-            ORDER BY created_at DESC
-        """)
+        # Only two fixed texts per list (first page / later pages): prepare them up front
+        await db_cursor.execute(query, params, prepare=True)
         
-        users = cursor.fetchall()
-        return [dict(user) for user in users]
+        users = await db_cursor.fetchall()
+        return page(users, limit)
 
 @router.get("/user/{user_id}", response_model=UserResponse)
 async def get_user_details(
     user_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Get detailed information about a specific user"""
-    verify_super_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, email, full_name, phone, role, is_active, created_at
-            FROM users WHERE id = %s
-        """, (user_id,))
+        await cursor.execute(USER_BY_ID, (user_id,), prepare=True)
         
-        user = cursor.fetchone()
+        user = await cursor.fetchone()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        return dict(user)
+        return user
 
 @router.get("/categories", response_model=List[CategoryResponse])
-async def get_categories(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_categories(payload: dict = Depends(require_super_admin)):
     """Get all categories"""
-    verify_super_admin(credentials)
+    body = _categories_cache.get("all")
+    if body is None:
+        async with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            await cursor.execute(CATEGORIES_ALL, prepare=True)
+            categories = await cursor.fetchall()
+        
+        body = _categories_cache["all"] = _CategoryListAdapter.dump_json(
+            _CategoryListAdapter.validate_python(categories)
+        )
     
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("SELECT * FROM categories ORDER BY name")
-        categories = cursor.fetchall()
-        return [dict(category) for category in categories]
+    return Response(content=body, media_type="application/json")
 
 @router.post("/categories", response_model=CategoryResponse)
 async def create_category(
     category: CategoryCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Create a new category"""
-    verify_super_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             INSERT INTO categories (name, description, icon)
             VALUES (%s, %s, %s)
             RETURNING *
         """, (category.name, category.description, category.icon))
         
-        new_category = cursor.fetchone()
-        conn.commit()
-        
-        return dict(new_category)
+        new_category = await cursor.fetchone()
+        _dashboard_cache.clear()
+        _categories_cache.clear()
+        return new_category
 
 @router.put("/categories/{category_id}", response_model=CategoryResponse)
 async def update_category(
     category_id: int,
     category: CategoryCreate,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Update a category"""
-    verify_super_admin(credentials)
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    async with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cursor.execute("""
+        await cursor.execute("""
             UPDATE categories SET name = %s, description = %s, icon = %s
             WHERE id = %s
             RETURNING *
         """, (category.name, category.description, category.icon, category_id))
         
-        updated_category = cursor.fetchone()
+        updated_category = await cursor.fetchone()
         
         if not updated_category:
             raise HTTPException(
@@ -284,39 +289,38 @@ async def update_category(
                 detail="Category not found"
             )
         
-        conn.commit()
-        
-        return dict(updated_category)
+        _categories_cache.clear()
+        return updated_category
 
 @router.delete("/categories/{category_id}")
 async def delete_category(
     category_id: int,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    payload: dict = Depends(require_super_admin)
 ):
     """Delete a category"""
-    verify_super_admin(credentials)
-    
-    with get_db_connection() as conn:
+    async with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Check if category is being used by restaurants
-        cursor.execute("SELECT COUNT(*) FROM restaurants WHERE category_id = %s", (category_id,))
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
+        # Delete only if no restaurant uses the category, in one statement
+        await cursor.execute("""
+            DELETE FROM categories
+            WHERE id = %s AND NOT EXISTS (SELECT 1 FROM restaurants WHERE category_id = %s)
+            RETURNING id
+        """, (category_id, category_id))
+        
+        if not await cursor.fetchone():
+            # Nothing deleted: tell a missing category apart from one still in use
+            await cursor.execute("SELECT 1 FROM categories WHERE id = %s", (category_id,))
+            if not await cursor.fetchone():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Category not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot delete category that is being used by restaurants"
             )
         
-        cursor.execute("DELETE FROM categories WHERE id = %s", (category_id,))
-        
-        if cursor.rowcount == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
-        
-        conn.commit()
-        
+        _dashboard_cache.clear()
+        _categories_cache.clear()
         return {"message": "Category deleted successfully"}
@@ -1,16 +1,19 @@
 import jwt
 import bcrypt
+import time
 from datetime import datetime, timedelta
+from hashlib import blake2b
+from cachetools import TTLCache
 from fastapi import HTTPException, status
-import os
+from starlette.concurrency import run_in_threadpool
+from utils.settings import SECRET_KEY, BCRYPT_ROUNDS
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -18,6 +21,16 @@ def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+# bcrypt is deliberately slow CPU work (and releases the GIL); async handlers use
+# these so hashing runs on the threadpool instead of stalling the event loop
+async def hash_password_async(password: str) -> str:
+    """hash_password off the event loop"""
+    return await run_in_threadpool(hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """verify_password off the event loop"""
+    return await run_in_threadpool(verify_password, password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -30,10 +43,27 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Verified payloads keyed by a short token digest; only successful decodes are stored
+# and expiry is still re-checked on every hit, so the TTL just bounds memory/staleness
+_token_cache = TTLCache(maxsize=10_000, ttl=60)
+
+def _decode_token(token: str) -> dict:
+    """Signature-checked JWT decode, cached per token"""
+    key = blake2b(token.encode(), digest_size=16).digest()
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        _token_cache[key] = payload
+    return payload
+
 def verify_token(token: str):
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _decode_token(token)
+        # A cached payload skips PyJWT's own expiry check, so repeat it here
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
         user_id: int = payload.get("sub")
         if user_id is None:
             raise HTTPException(
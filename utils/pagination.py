@@ -0,0 +1,24 @@
+from datetime import datetime
+from fastapi import HTTPException, status
+
+def encode_cursor(row) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of the last row on a page"""
+    return f"{row['created_at'].isoformat()},{row['id']}"
+
+def decode_cursor(cursor: str):
+    """Parse a cursor from encode_cursor back into (created_at, id)"""
+    try:
+        created_at, row_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def page(rows, limit: int) -> dict:
+    """Build {items, next_cursor} from up to limit + 1 fetched rows"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return {"items": rows, "next_cursor": encode_cursor(rows[-1])}
+    return {"items": rows, "next_cursor": None}
@@ -0,0 +1,39 @@
+import orjson
+from hashlib import blake2b
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+# Public reads may be reused briefly by browsers/CDNs and served stale while revalidating
+PUBLIC_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+def cached_json_response(request: Request, body: bytes) -> Response:
+    """JSON response with a content-hash ETag; 304 when the client already has this body"""
+    etag = '"' + blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def list_response(adapter: TypeAdapter, rows, request: Request = None) -> Response:
+    """Validate and serialize a list of DB rows in a single pydantic-core pass"""
+    body = adapter.dump_json(adapter.validate_python(rows))
+    if request is not None:
+        return cached_json_response(request, body)
+    return Response(content=body, media_type="application/json")
+
+def raw_list_response(rows) -> Response:
+    """Serialize trusted DB rows with orjson, skipping response-model validation"""
+    return Response(content=orjson.dumps(rows), media_type="application/json")
+
+async def _json_array(rows, dumps):
+    """Encode an async row iterator as a JSON array, one element at a time"""
+    separator = b"["
+    async for row in rows:
+        yield separator + dumps(row)
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+def stream_list_response(rows) -> StreamingResponse:
+    """Stream a JSON array from an async row iterator"""
+    return StreamingResponse(_json_array(rows, orjson.dumps), media_type="application/json")
@@ -0,0 +1,70 @@
+import os
+from dotenv import load_dotenv
+from psycopg.conninfo import make_conninfo
+
+# Load .env file for local development (once per process tree; workers and
+# re-imports see the sentinel and skip re-reading the file)
+if not os.environ.get("_MENUZY_DOTENV"):
+    load_dotenv()
+    os.environ["_MENUZY_DOTENV"] = "1"
+
+# Deployment environment ("dev", "test", or unset for production)
+ENV = os.getenv("ENV", "")
+
+# Worker processes for `python main.py` (ignored when ENV=dev enables auto-reload).
+# Each worker opens its own pool, so Postgres may see up to
+# WEB_CONCURRENCY * DB_POOL_MAX_SIZE connections; the default stays small
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, 2)))
+
+# Prefer DATABASE_URL (Render), fallback to manual config for local.
+# DB_HOST may be a socket directory (e.g. /var/run/postgresql) when the app
+# shares a host or volume with Postgres, which skips the loopback TCP stack.
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if DATABASE_URL:
+    DB_CONN_STRING = DATABASE_URL
+else:
+    DB_CONN_STRING = make_conninfo(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5432'),
+        dbname=os.getenv('DB_NAME', 'menuzy'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', 'postgres'),
+    )
+
+# Test databases are cloned from a pre-built template instead of re-running the DDL
+TEMPLATE_DB_NAME = os.getenv("DB_TEMPLATE_NAME", "menuzy_template")
+TEST_DB_NAME = os.getenv("DB_TEST_NAME", "menuzy_test")
+
+# Test runs talk to the clone, never the main database
+if ENV == "test":
+    DB_CONN_STRING = make_conninfo(DB_CONN_STRING, dbname=TEST_DB_NAME)
+
+# Set when DB_HOST/DATABASE_URL points at PgBouncer in transaction pooling mode
+USE_PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+# Connection pool sizing (per worker process). DB_POOL_CHECK pings a connection
+# on every checkout, trading one round-trip for never handing out a dead one
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "4"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "32"))
+DB_POOL_CHECK = os.getenv("DB_POOL_CHECK", "").lower() in ("1", "true", "yes")
+# Seconds a request waits for a free pooled connection before it is shed with a 503
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# Milliseconds a streamed (server-side cursor) response may spend per statement or
+# idle between fetches before Postgres ends it and its connection is discarded
+DB_STREAM_TIMEOUT_MS = int(os.getenv("DB_STREAM_TIMEOUT_MS", "30000"))
+
+# Executions of the same statement on a connection before psycopg prepares it
+# server-side (ignored behind PgBouncer, where prepared statements are disabled)
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "3"))
+
+SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
+
+# bcrypt cost factor for new password hashes (each +1 doubles hashing time);
+# existing hashes keep verifying with the cost they were created with
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Comma-separated list of browser origins allowed to call the API
+CORS_ORIGINS = tuple(
+    origin.strip() for origin in os.getenv("CORS_ORIGINS", "https://menuzy.app").split(",") if origin.strip()
+)